@@ -8,14 +8,23 @@ Author: Doug Andrade (with Claude AI assistance)
 For: Naval Postgraduate School, CS3670 Secure Management of Systems
 """
 
-import requests
+import difflib
 import json
+import os
 import sys
+import threading
+import time
 from datetime import datetime
+from types import MappingProxyType
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
-# Team ID mapping for common teams
-TEAM_IDS = {
+
+# Team ID mapping for common teams (read-only)
+TEAM_IDS = MappingProxyType({
     'navy': '2426',
     'air force': '2005',
     'army': '349',
@@ -78,7 +87,53 @@ TEAM_IDS = {
     'smu': '2567',
     'memphis': '235',
     'tulane': '2655',
-}
+})
+
+# Shared read-only stand-in for missing nested objects in API responses
+EMPTY = MappingProxyType({})
+
+# Date formats for the next-game line and season results rows
+DATE_FORMAT_FULL = '%A, %B %d, %Y at %I:%M %p %Z'
+DATE_FORMAT_SHORT = '%m/%d/%y'
+
+# Parser for ESPN's ISO datetimes, which end in 'Z' (UTC)
+if sys.version_info >= (3, 11):
+    # fromisoformat accepts the trailing 'Z' natively
+    parse_datetime = datetime.fromisoformat
+else:
+    def parse_datetime(date_str):
+        """Parse ESPN ISO datetime string (UTC 'Z' suffix)"""
+        if date_str.endswith('Z'):
+            date_str = date_str[:-1] + '+00:00'
+        return datetime.fromisoformat(date_str)
+
+# Game status names - games in FINISHED_STATUSES are never the "next" game
+STATUS_FINAL = 'STATUS_FINAL'
+FINISHED_STATUSES = frozenset({STATUS_FINAL, 'STATUS_POSTPONED'})
+
+# Team names for close-match suggestions on lookup misses
+TEAM_NAMES = tuple(TEAM_IDS)
+
+# Example team names shown when a lookup fails, three per line
+EXAMPLE_TEAMS = tuple(name.title() for name in TEAM_NAMES[:15])
+EXAMPLE_LINES = tuple(
+    ', '.join(EXAMPLE_TEAMS[i:i+3]) for i in range(0, len(EXAMPLE_TEAMS), 3)
+)
+
+
+# User-Agent sent with every ESPN request
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+
+# Shared HTTP session, created on first use by get_session()
+_session = None
+_session_lock = threading.Lock()
+
+# On-disk cache of ESPN responses, one file per URL
+CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'cfb_checker')
+
+# Seconds a cached response is used without contacting ESPN
+TEAM_CACHE_TTL = 60 * 60
+SCHEDULE_CACHE_TTL = 5 * 60
 
 
 def get_team_id(team_name):
@@ -87,18 +142,140 @@ def get_team_id(team_name):
     return TEAM_IDS.get(team_name_lower)
 
 
+def suggest_team(team_name):
+    """Suggest the closest supported team name for a lookup miss"""
+    matches = difflib.get_close_matches(team_name.lower(), TEAM_NAMES, n=1, cutoff=0.8)
+    if matches:
+        return matches[0].title()
+    return None
+
+
+def json_loads(data):
+    """Decode JSON, using orjson when it is installed"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def json_dumps(obj):
+    """Encode JSON to bytes, using orjson when it is installed"""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj).encode('utf-8')
+
+
+def get_session():
+    """Get the shared HTTP session so ESPN requests reuse keep-alive connections"""
+    global _session
+    with _session_lock:
+        if _session is None:
+            # Imported here so lookups that never hit the network start faster
+            import requests
+            from requests.adapters import HTTPAdapter
+            from urllib3.util.retry import Retry
+            
+            session = requests.Session()
+            session.headers['User-Agent'] = USER_AGENT
+            session.mount('https://', HTTPAdapter(
+                pool_connections=2,
+                pool_maxsize=2,
+                max_retries=Retry(total=2, backoff_factor=0.2),
+            ))
+            _session = session
+        return _session
+
+
+def cache_path(url):
+    """Get the cache file path for a URL"""
+    import hashlib
+    
+    key = hashlib.blake2b(url.encode('utf-8'), digest_size=16).hexdigest()
+    return os.path.join(CACHE_DIR, key + '.json')
+
+
+def load_cache(path):
+    """Load and decode a cached response, ignoring missing or malformed entries"""
+    try:
+        with open(path, 'rb') as f:
+            entry = json_loads(f.read())
+        if not isinstance(entry, dict) or not isinstance(entry.get('body'), str):
+            return None
+        entry['data'] = json_loads(entry['body'])
+    except (OSError, ValueError):
+        return None
+    return entry
+
+
+def save_cache(path, entry):
+    """Write a cached response to disk (best effort)"""
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(json_dumps(entry))
+        os.replace(tmp_path, path)
+    except OSError:
+        pass
+
+
+def cached_get(url, ttl):
+    """GET a URL, serving a fresh cached copy and revalidating stale ones"""
+    path = cache_path(url)
+    entry = load_cache(path)
+    
+    # Still within TTL - skip the network entirely
+    if entry:
+        try:
+            if os.path.getmtime(path) + ttl > time.time():
+                return entry['data']
+        except OSError:
+            pass
+    
+    headers = {}
+    if entry:
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+    
+    try:
+        response = get_session().get(url, headers=headers, timeout=10)
+    except Exception:
+        # Network trouble - better stale data than none
+        if entry:
+            return entry['data']
+        raise
+    
+    # ESPN is having trouble - serve the stale copy if there is one
+    if response.status_code >= 500 and entry:
+        return entry['data']
+    
+    # Not modified - reuse the cached body and restart its TTL
+    if response.status_code == 304 and entry:
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return entry['data']
+    
+    response.raise_for_status()
+    data = json_loads(response.content)
+    
+    save_cache(path, {
+        'etag': response.headers.get('ETag'),
+        'last_modified': response.headers.get('Last-Modified'),
+        'body': response.text
+    })
+    
+    return data
+
+
 def get_team_data(team_id):
     """Fetch team data from ESPN API"""
     url = f"https://site.api.espn.com/apis/site/v2/sports/football/college-football/teams/{team_id}"
     
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-    }
-    
     try:
-        response = requests.get(url, headers=headers, timeout=10)
-        response.raise_for_status()
-        return response.json()
+        return cached_get(url, TEAM_CACHE_TTL)
     except Exception as e:
         print(f"Error fetching team data: {e}")
         return None
@@ -108,23 +285,32 @@ def get_team_schedule(team_id):
     """Fetch team schedule from ESPN API"""
     url = f"https://site.api.espn.com/apis/site/v2/sports/football/college-football/teams/{team_id}/schedule"
     
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-    }
-    
     try:
-        response = requests.get(url, headers=headers, timeout=10)
-        response.raise_for_status()
-        return response.json()
+        return cached_get(url, SCHEDULE_CACHE_TTL)
     except Exception as e:
         print(f"Error fetching schedule: {e}")
         return None
 
 
-def find_next_game(schedule_data):
-    """Find the next upcoming game from schedule"""
+def parse_score(raw):
+    """Convert a score to int - it might be a dict with 'value' key, a number or a string"""
+    if isinstance(raw, dict):
+        raw = raw.get('value', 0)
+    try:
+        if isinstance(raw, (int, float)):
+            return int(raw)
+        return int(float(raw))
+    except (TypeError, ValueError, OverflowError):
+        return 0
+
+
+def classify_schedule(schedule_data, our_team_id):
+    """Split schedule into completed game results and the next upcoming game"""
+    completed_games = []
+    next_event = None
+    
     if not schedule_data:
-        return None
+        return completed_games, next_event
     
     events = schedule_data.get('events', [])
     
@@ -134,22 +320,79 @@ def find_next_game(schedule_data):
             continue
         
         competition = competitions[0]
-        status = competition.get('status', {})
-        status_type = status.get('type', {}).get('name', '')
+        status = competition.get('status') or EMPTY
+        status_type = (status.get('type') or EMPTY).get('name', '')
         
-        # Look for games that haven't been played yet
-        if status_type not in ['STATUS_FINAL', 'STATUS_POSTPONED']:
-            return event
+        # Completed games go into the results list
+        if status_type == STATUS_FINAL:
+            competitors = competition.get('competitors', [])
+            
+            our_team_info = None
+            opponent_info = None
+            our_is_home = False
+            
+            for comp in competitors:
+                team_info = comp.get('team') or EMPTY
+                if team_info.get('id') == our_team_id:
+                    our_team_info = comp
+                    our_is_home = comp.get('homeAway') == 'home'
+                else:
+                    opponent_info = comp
+            
+            if our_team_info and opponent_info:
+                our_score = parse_score(our_team_info.get('score', 0))
+                opp_score = parse_score(opponent_info.get('score', 0))
+                
+                opp_team = opponent_info.get('team') or EMPTY
+                opp_name = opp_team.get('displayName', 'Unknown')
+                opp_rank = (opponent_info.get('curatedRank') or EMPTY).get('current', 0)
+                
+                # Determine if home or away
+                location = 'vs' if our_is_home else '@'
+                
+                # Add rank to opponent name - show UR for unranked
+                if opp_rank > 0 and opp_rank <= 25:
+                    opp_display = f"#{opp_rank} {opp_name}"
+                else:
+                    opp_display = f"(UR) {opp_name}"
+                
+                # Determine W/L
+                if our_score > opp_score:
+                    result = 'W'
+                else:
+                    result = 'L'
+                
+                # Get date
+                date_str = event.get('date', '')
+                game_date = 'Unknown'
+                if date_str:
+                    try:
+                        dt = parse_datetime(date_str)
+                        game_date = dt.strftime(DATE_FORMAT_SHORT)
+                    except:
+                        pass
+                
+                completed_games.append({
+                    'date': game_date,
+                    'result': result,
+                    'score': f"{our_score}-{opp_score}",
+                    'opponent': opp_display,
+                    'location': location
+                })
+        
+        # First game that hasn't been played yet
+        elif next_event is None and status_type not in FINISHED_STATUSES:
+            next_event = event
     
-    return None
+    return completed_games, next_event
 
 
 def format_datetime(date_str):
     """Format ISO datetime string"""
     try:
-        dt = datetime.fromisoformat(date_str.replace('Z', '+00:00'))
+        dt = parse_datetime(date_str)
         local_dt = dt.astimezone()
-        return local_dt.strftime('%A, %B %d, %Y at %I:%M %p %Z')
+        return local_dt.strftime(DATE_FORMAT_FULL)
     except:
         return date_str
 
@@ -160,6 +403,8 @@ def display_team_info(team_data, schedule_data):
         print("❌ Could not retrieve team information")
         return
     
+    out = []
+    
     team = team_data.get('team', {})
     team_name = team.get('displayName', 'Unknown Team')
     
@@ -170,9 +415,9 @@ def display_team_info(team_data, schedule_data):
     else:
         team_display = f"(UR) {team_name}"
     
-    print("\n" + "="*70)
-    print(f"  {team_display}")
-    print("="*70)
+    out.append("\n" + "="*70)
+    out.append(f"  {team_display}")
+    out.append("="*70)
     
     # Get record
     record_items = team.get('record', {}).get('items', [])
@@ -181,7 +426,7 @@ def display_team_info(team_data, schedule_data):
         for item in record_items:
             if item.get('type') == 'total' or item.get('name') == 'overall':
                 summary = item.get('summary', 'N/A')
-                print(f"\n📊 Current Record: {summary}")
+                out.append(f"\n📊 Current Record: {summary}")
                 
                 # Show additional stats if available
                 stats = item.get('stats', [])
@@ -194,108 +439,27 @@ def display_team_info(team_data, schedule_data):
         else:
             # Fallback to first record item
             summary = record_items[0].get('summary', 'N/A')
-            print(f"\n📊 Current Record: {summary}")
+            out.append(f"\n📊 Current Record: {summary}")
     else:
-        print(f"\n📊 Current Record: N/A")
+        out.append(f"\n📊 Current Record: N/A")
+    
+    # Walk the schedule once for both season results and the next game
+    completed_games, next_game = classify_schedule(schedule_data, team.get('id'))
     
     # Display season results
     if schedule_data:
-        events = schedule_data.get('events', [])
-        completed_games = []
-        
-        for event in events:
-            competitions = event.get('competitions', [])
-            if not competitions:
-                continue
-            
-            competition = competitions[0]
-            status = competition.get('status', {})
-            status_type = status.get('type', {}).get('name', '')
-            
-            # Only show completed games
-            if status_type == 'STATUS_FINAL':
-                competitors = competition.get('competitors', [])
-                our_team_id = team.get('id')
-                
-                home_team = None
-                away_team = None
-                our_team_info = None
-                opponent_info = None
-                
-                for comp in competitors:
-                    if comp.get('homeAway') == 'home':
-                        home_team = comp
-                    else:
-                        away_team = comp
-                    
-                    if comp.get('team', {}).get('id') == our_team_id:
-                        our_team_info = comp
-                    else:
-                        opponent_info = comp
-                
-                if our_team_info and opponent_info:
-                    # Handle score - it might be a dict with 'value' key or just a number
-                    our_score_raw = our_team_info.get('score', 0)
-                    opp_score_raw = opponent_info.get('score', 0)
-                    
-                    our_score = our_score_raw.get('value', our_score_raw) if isinstance(our_score_raw, dict) else our_score_raw
-                    opp_score = opp_score_raw.get('value', opp_score_raw) if isinstance(opp_score_raw, dict) else opp_score_raw
-                    
-                    # Convert to int for cleaner display
-                    our_score = int(float(our_score))
-                    opp_score = int(float(opp_score))
-                    
-                    opp_name = opponent_info.get('team', {}).get('displayName', 'Unknown')
-                    opp_rank = opponent_info.get('curatedRank', {}).get('current', 0)
-                    
-                    # Determine if home or away
-                    is_home = our_team_info.get('homeAway') == 'home'
-                    location = 'vs' if is_home else '@'
-                    
-                    # Add rank to opponent name - show UR for unranked
-                    if opp_rank > 0 and opp_rank <= 25:
-                        opp_display = f"#{opp_rank} {opp_name}"
-                    else:
-                        opp_display = f"(UR) {opp_name}"
-                    
-                    # Determine W/L
-                    if our_score > opp_score:
-                        result = 'W'
-                    else:
-                        result = 'L'
-                    
-                    # Get date
-                    date_str = event.get('date', '')
-                    game_date = 'Unknown'
-                    if date_str:
-                        try:
-                            dt = datetime.fromisoformat(date_str.replace('Z', '+00:00'))
-                            game_date = dt.strftime('%m/%d/%y')
-                        except:
-                            pass
-                    
-                    completed_games.append({
-                        'date': game_date,
-                        'result': result,
-                        'score': f"{our_score}-{opp_score}",
-                        'opponent': opp_display,
-                        'location': location
-                    })
-        
         if completed_games:
-            print(f"\n📅 SEASON RESULTS")
-            print("-" * 70)
+            out.append(f"\n📅 SEASON RESULTS")
+            out.append("-" * 70)
             for game in completed_games:
-                print(f"   {game['date']}  {game['result']}  {game['score']:>7}  {game['location']} {game['opponent']}")
+                out.append(f"   {game['date']}  {game['result']}  {game['score']:>7}  {game['location']} {game['opponent']}")
         else:
-            print(f"\n📅 No games completed yet this season")
-    
-    # Find and display next game
-    next_game = find_next_game(schedule_data)
+            out.append(f"\n📅 No games completed yet this season")
     
+    # Display next game
     if next_game:
-        print(f"\n🏈 NEXT GAME")
-        print("-" * 70)
+        out.append(f"\n🏈 NEXT GAME")
+        out.append("-" * 70)
         
         competitions = next_game.get('competitions', [])
         if competitions:
@@ -315,10 +479,12 @@ def display_team_info(team_data, schedule_data):
             
             # Display matchup
             if home_team and away_team:
-                home_name = home_team.get('team', {}).get('displayName', 'Unknown')
-                away_name = away_team.get('team', {}).get('displayName', 'Unknown')
-                home_rank = home_team.get('curatedRank', {}).get('current', 0)
-                away_rank = away_team.get('curatedRank', {}).get('current', 0)
+                home_info = home_team.get('team') or EMPTY
+                away_info = away_team.get('team') or EMPTY
+                home_name = home_info.get('displayName', 'Unknown')
+                away_name = away_info.get('displayName', 'Unknown')
+                home_rank = (home_team.get('curatedRank') or EMPTY).get('current', 0)
+                away_rank = (away_team.get('curatedRank') or EMPTY).get('current', 0)
                 
                 # Add rankings if available - show UR for unranked
                 if home_rank > 0 and home_rank <= 25:
@@ -331,29 +497,30 @@ def display_team_info(team_data, schedule_data):
                 else:
                     away_display = f"UR {away_name}"
                 
-                if home_team.get('team', {}).get('id') == our_team_id:
-                    print(f"   Opponent: {away_display}")
-                    print(f"   Location: Home")
+                if home_info.get('id') == our_team_id:
+                    out.append(f"   Opponent: {away_display}")
+                    out.append(f"   Location: Home")
                 else:
-                    print(f"   Opponent: {home_display}")
-                    print(f"   Location: Away @ {home_name}")
+                    out.append(f"   Opponent: {home_display}")
+                    out.append(f"   Location: Away @ {home_name}")
             
             # Date and time
             date_str = next_game.get('date', '')
             if date_str:
                 formatted_date = format_datetime(date_str)
-                print(f"   Date/Time: {formatted_date}")
+                out.append(f"   Date/Time: {formatted_date}")
             
             # Venue
             venue = competition.get('venue', {})
             if venue:
                 venue_name = venue.get('fullName', '')
-                city = venue.get('address', {}).get('city', '')
-                state = venue.get('address', {}).get('state', '')
+                address = venue.get('address') or EMPTY
+                city = address.get('city', '')
+                state = address.get('state', '')
                 if venue_name:
-                    print(f"   Venue: {venue_name}")
+                    out.append(f"   Venue: {venue_name}")
                     if city and state:
-                        print(f"          {city}, {state}")
+                        out.append(f"          {city}, {state}")
             
             # Broadcast info
             broadcasts = competition.get('broadcasts', [])
@@ -363,13 +530,16 @@ def display_team_info(team_data, schedule_data):
                     names = broadcast.get('names', [])
                     networks.extend(names)
                 if networks:
-                    print(f"\n📺 TV: {', '.join(networks)}")
+                    out.append(f"\n📺 TV: {', '.join(networks)}")
     
     else:
-        print(f"\n🏈 No upcoming games scheduled")
-        print("   The season may have ended or the schedule is not yet available.")
+        out.append(f"\n🏈 No upcoming games scheduled")
+        out.append("   The season may have ended or the schedule is not yet available.")
     
-    print("\n" + "="*70 + "\n")
+    out.append("\n" + "="*70 + "\n")
+    
+    # Write the whole report at once
+    sys.stdout.write('\n'.join(out) + '\n')
 
 
 def main():
@@ -393,22 +563,28 @@ def main():
     
     if not team_id:
         print(f"\n❌ Team '{team_name}' not found in database.")
+        suggestion = suggest_team(team_name)
+        if suggestion:
+            print(f"\nDid you mean '{suggestion}'?")
         print("\nSupported teams include:")
         # Show some examples
-        examples = list(TEAM_IDS.keys())[:15]
-        for i in range(0, len(examples), 3):
-            line = examples[i:i+3]
-            print(f"   {', '.join([t.title() for t in line])}")
-        print(f"   ... and {len(TEAM_IDS) - 15} more")
+        print('\n'.join('   ' + line for line in EXAMPLE_LINES))
+        print(f"   ... and {len(TEAM_IDS) - len(EXAMPLE_TEAMS)} more")
         print("\nTry one of these team names.")
         return
     
     print(f"✓ Found team (ID: {team_id})")
     print("Fetching team information...")
     
-    # Get data
-    team_data = get_team_data(team_id)
-    schedule_data = get_team_schedule(team_id)
+    # Imported here so the not-found path doesn't pay for it
+    from concurrent.futures import ThreadPoolExecutor
+    
+    # Get data - the two requests are independent, so run them concurrently
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        team_future = pool.submit(get_team_data, team_id)
+        schedule_future = pool.submit(get_team_schedule, team_id)
+        team_data = team_future.result()
+        schedule_data = schedule_future.result()
     
     # Display
     display_team_info(team_data, schedule_data)